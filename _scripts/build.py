@@ -0,0 +1,417 @@
+#!/usr/bin/env python3
+"""
+Run the site's pre-Jekyll Python steps as a dependency graph.
+
+Each step declares the files it reads and writes. A step waits only for the
+steps that produce its inputs, so independent steps run concurrently. Steps
+whose inputs (and outputs) are unchanged since their last successful run are
+skipped; steps that pull remote data are marked volatile and always run. A
+step that fails or times out can fall back to its existing, stale outputs;
+a best-effort step without any is reported as degraded and does not fail the
+build.
+
+Usage:
+    conda activate cv_pdf
+    python _scripts/build.py
+    python _scripts/build.py --steps cv --force
+
+Cache:
+    ../.build_cache.json (input and output hashes of successful runs). CI
+    restores it together with the CV outputs via actions/cache, keyed on the
+    CV step's inputs, so an unchanged CV is not rebuilt there either.
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+import os
+import re
+import subprocess
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from pathlib import Path
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+SCRIPT_DIR = Path(__file__).parent.resolve()
+ROOT_DIR = SCRIPT_DIR.parent
+CACHE_PATH = ROOT_DIR / ".build_cache.json"
+
+WRANGLER_PATH = ROOT_DIR / "cloudflare-worker" / "wrangler.toml"
+
+SCHOLAR_USER = "6j85aJMAAAAJ"
+
+# CI passes the Square token under this name so that only the catalog step
+# sees it; enrich_inventory keeps scraping as before
+CATALOG_TOKEN_VAR = "CATALOG_SQUARE_ACCESS_TOKEN"
+
+# Size budget for each generated CV file. Provisional: it only warns until the
+# --optimize output size has been recorded in CI, then it should become a
+# --max-size (fail) budget set from that number plus headroom
+CV_WARN_SIZE_KB = 400
+
+
+def worker_square_environment():
+    """Read SQUARE_ENVIRONMENT from wrangler.toml so the snapshot matches the worker."""
+    try:
+        text = WRANGLER_PATH.read_text(encoding="utf-8")
+    except OSError:
+        return "sandbox"
+    match = re.search(r'^SQUARE_ENVIRONMENT\s*=\s*"([^"]*)"', text, re.M)
+    return match.group(1) if match else "sandbox"
+
+
+# Build steps keyed by name. Paths are relative to the repository root.
+#   cmd:         command line, run from the repository root
+#   inputs:      files the step reads; steps producing them run first
+#   outputs:     files the step writes
+#   timeout:     seconds before the step is killed
+#   volatile:    reads remote data, so never skipped on unchanged inputs
+#   allow_stale: on failure keep existing outputs instead of failing the build
+#   best_effort: like allow_stale, but also continue ("degraded") when there are
+#                no outputs to fall back to
+#   stale_env:   GitHub Actions env var set to "true" when falling back
+#   env:         extra environment variables for this step only
+STEPS = {
+    "publications": {
+        "cmd": [
+            sys.executable, "_scripts/gscrawler.py",
+            "-u", SCHOLAR_USER, "-o", "_includes/publications.md",
+        ],
+        "inputs": ["_scripts/gscrawler.py"],
+        "outputs": ["_includes/publications.md"],
+        "timeout": 120,
+        "volatile": True,
+        "allow_stale": True,
+        "stale_env": "PUBLICATION_FETCH_FAILED",
+    },
+    "cv": {
+        "cmd": [
+            sys.executable, "_scripts/generate_cv_pdf.py",
+            "--optimize", "--warn-size", str(CV_WARN_SIZE_KB),
+        ],
+        "inputs": [
+            "_scripts/generate_cv_pdf.py",
+            "_scripts/cv_style.css",
+            "_scripts/cv_screen.css",
+            "_includes/cv.md",
+        ],
+        "outputs": [
+            "static/files/CXHernandez_CV.pdf",
+            "static/files/CXHernandez_CV_A4.pdf",
+            "static/files/CXHernandez_CV.html",
+        ],
+        "timeout": 300,
+        "volatile": False,
+        "allow_stale": False,
+    },
+    "inventory": {
+        "cmd": [
+            sys.executable, "scripts/enrich_inventory.py",
+            "static/files/store/inventory.json",
+        ],
+        "inputs": ["scripts/enrich_inventory.py", "static/files/store/inventory.json"],
+        "outputs": ["static/files/store/inventory.json"],
+        "timeout": 180,
+        "volatile": True,
+        "allow_stale": True,
+    },
+    "catalog": {
+        "cmd": [
+            sys.executable, "scripts/catalog_snapshot.py",
+            "static/files/store/catalog.json",
+        ],
+        "inputs": ["scripts/catalog_snapshot.py", "scripts/enrich_inventory.py"],
+        "outputs": ["static/files/store/catalog.json"],
+        "timeout": 120,
+        "volatile": True,
+        "allow_stale": True,
+        # The worker falls back to live Square requests without a snapshot
+        "best_effort": True,
+        "env": {
+            "SQUARE_ACCESS_TOKEN": (
+                os.environ.get(CATALOG_TOKEN_VAR)
+                or os.environ.get("SQUARE_ACCESS_TOKEN", "")
+            ),
+            "SQUARE_ENVIRONMENT": worker_square_environment(),
+        },
+    },
+}
+
+
+def hash_files(paths, extra=()):
+    """Hash file names and contents (missing files hash as absent)."""
+    digest = hashlib.sha256()
+    for item in extra:
+        digest.update(item.encode("utf-8") + b"\0")
+    for path in sorted(paths):
+        digest.update(path.encode("utf-8") + b"\0")
+        full_path = ROOT_DIR / path
+        if full_path.exists():
+            digest.update(full_path.read_bytes())
+        else:
+            digest.update(b"<missing>")
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def get_dependencies(steps):
+    """Map each step to the steps that produce one of its inputs."""
+    producers = {}
+    for name in steps:
+        for output in STEPS[name]["outputs"]:
+            producers.setdefault(output, set()).add(name)
+
+    dependencies = {}
+    for name in steps:
+        deps = set()
+        for path in STEPS[name]["inputs"]:
+            deps |= producers.get(path, set())
+        # A step that updates a file in place does not depend on itself
+        deps.discard(name)
+        dependencies[name] = deps
+    return dependencies
+
+
+def check_acyclic(dependencies):
+    """Raise ValueError if the step graph contains a cycle."""
+    visiting, done = set(), set()
+
+    def visit(name):
+        if name in done:
+            return
+        if name in visiting:
+            raise ValueError(f"Dependency cycle through step {name!r}")
+        visiting.add(name)
+        for dep in dependencies[name]:
+            visit(dep)
+        visiting.discard(name)
+        done.add(name)
+
+    for name in dependencies:
+        visit(name)
+
+
+def load_cache(path):
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+
+
+def is_up_to_date(name, cache):
+    """True if the step's inputs and outputs match its last successful run."""
+    step = STEPS[name]
+    entry = cache.get(name)
+    if step["volatile"] or not entry:
+        return False
+    if not all((ROOT_DIR / path).exists() for path in step["outputs"]):
+        return False
+    return (
+        entry.get("inputs") == hash_files(step["inputs"], step["cmd"][1:])
+        and entry.get("outputs") == hash_files(step["outputs"])
+    )
+
+
+def print_output(name, *streams):
+    """Print captured output in one block so concurrent steps don't interleave."""
+    for stream in streams:
+        if not stream:
+            continue
+        # TimeoutExpired carries bytes even when the step ran in text mode
+        if isinstance(stream, bytes):
+            stream = stream.decode("utf-8", errors="replace")
+        for line in stream.splitlines():
+            print(f"[{name}] {line}", flush=True)
+
+
+def run_step(name):
+    """Run one step in a subprocess.
+
+    Returns:
+        Tuple of (succeeded, message)
+    """
+    step = STEPS[name]
+    env = {k: v for k, v in os.environ.items() if k != CATALOG_TOKEN_VAR}
+    env.update(step.get("env", {}))
+    try:
+        result = subprocess.run(
+            step["cmd"],
+            cwd=ROOT_DIR,
+            env=env,
+            capture_output=True,
+            text=True,
+            timeout=step["timeout"],
+        )
+    except subprocess.TimeoutExpired as e:
+        # Show whatever the step printed before it was killed
+        print_output(name, e.stdout, e.stderr)
+        return False, f"timed out after {step['timeout']}s"
+
+    print_output(name, result.stdout, result.stderr)
+    if result.returncode != 0:
+        return False, f"exited with status {result.returncode}"
+    return True, ""
+
+
+def fall_back(name, message):
+    """Keep a failed step's existing outputs if it allows it.
+
+    Returns:
+        "stale" if the build continues with existing outputs, "degraded" if a
+        best-effort step has none, or None if the build should fail
+    """
+    step = STEPS[name]
+    if not (step["allow_stale"] or step.get("best_effort")):
+        return None
+    if all((ROOT_DIR / path).exists() for path in step["outputs"]):
+        status = "stale"
+        warning = f"Step {name} {message}; using stale outputs"
+    elif step.get("best_effort"):
+        status = "degraded"
+        warning = f"Step {name} {message}; continuing without its outputs"
+    else:
+        return None
+
+    logger.warning(warning)
+    if os.environ.get("GITHUB_ACTIONS") == "true":
+        print(f"::warning::{warning}", flush=True)
+        github_env = os.environ.get("GITHUB_ENV")
+        if github_env and step.get("stale_env"):
+            with open(github_env, "a") as f:
+                f.write(f"{step['stale_env']}=true\n")
+    return status
+
+
+def build(steps, jobs=None, force=False, cache_path=CACHE_PATH):
+    """Run steps in dependency order, concurrently where possible.
+
+    Returns:
+        Dict mapping step name to (status, elapsed seconds)
+    """
+    dependencies = get_dependencies(steps)
+    check_acyclic(dependencies)
+    cache = {} if force else load_cache(cache_path)
+    results = {}
+    pending = list(steps)
+    running = {}
+
+    with ThreadPoolExecutor(max_workers=jobs or len(steps)) as executor:
+        while pending or running:
+            for name in list(pending):
+                deps = dependencies[name]
+                if any(dep not in results for dep in deps):
+                    continue
+                pending.remove(name)
+
+                if any(results[dep][0] in ("failed", "blocked") for dep in deps):
+                    logger.error(f"Skipping {name}: a dependency failed")
+                    results[name] = ("blocked", 0.0)
+                elif is_up_to_date(name, cache):
+                    logger.info(f"Skipping {name}: inputs unchanged")
+                    results[name] = ("skipped", 0.0)
+                else:
+                    logger.info(f"Starting {name}")
+                    input_hash = hash_files(
+                        STEPS[name]["inputs"], STEPS[name]["cmd"][1:]
+                    )
+                    future = executor.submit(run_step, name)
+                    running[future] = (name, input_hash, time.perf_counter())
+
+            if not running:
+                continue
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                name, input_hash, start = running.pop(future)
+                elapsed = time.perf_counter() - start
+                try:
+                    succeeded, message = future.result()
+                except Exception as e:
+                    succeeded, message = False, f"failed: {e}"
+
+                if succeeded:
+                    logger.info(f"Finished {name} in {elapsed:.2f}s")
+                    cache[name] = {
+                        "inputs": input_hash,
+                        "outputs": hash_files(STEPS[name]["outputs"]),
+                    }
+                    results[name] = ("ok", elapsed)
+                elif status := fall_back(name, message):
+                    results[name] = (status, elapsed)
+                else:
+                    logger.error(f"Step {name} {message}")
+                    cache.pop(name, None)
+                    results[name] = ("failed", elapsed)
+
+    cache_path.write_text(json.dumps(cache, indent=4), encoding="utf-8")
+    return results
+
+
+def log_summary(results, wall_seconds):
+    """Log per-step status and timing."""
+    logger.info(f"{'step':<14} {'status':<8} {'time':>8}")
+    for name, (status, elapsed) in results.items():
+        logger.info(f"{name:<14} {status:<8} {elapsed:>7.2f}s")
+    serial = sum(elapsed for _, elapsed in results.values())
+    logger.info(f"Wall time {wall_seconds:.2f}s (steps total {serial:.2f}s)")
+
+
+def parse_cmdln():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument(
+        "-s",
+        "--steps",
+        dest="steps",
+        nargs="+",
+        choices=list(STEPS),
+        default=list(STEPS),
+        help="Steps to run (default: all)",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        dest="jobs",
+        type=int,
+        default=None,
+        help="Maximum concurrent steps (default: all)",
+    )
+    parser.add_argument(
+        "-f",
+        "--force",
+        dest="force",
+        action="store_true",
+        help="Run steps even if their inputs are unchanged",
+    )
+    return parser.parse_args()
+
+
+def main():
+    """Run the build and exit non-zero if any step failed."""
+    options = parse_cmdln()
+    # Preserve order while dropping duplicates
+    steps = list(dict.fromkeys(options.steps))
+
+    start = time.perf_counter()
+    try:
+        results = build(steps, options.jobs, options.force)
+    except Exception as e:
+        logger.error(f"Build failed: {e}")
+        sys.exit(1)
+    log_summary(results, time.perf_counter() - start)
+
+    if any(status in ("failed", "blocked") for status, _ in results.values()):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,18 +1,39 @@
 #!/usr/bin/env python3
 """
-Generate PDF version of CV from markdown using WeasyPrint.
+Generate PDF and HTML versions of CV from markdown using WeasyPrint.
+
+The markdown is parsed once and every requested target is rendered from the
+same HTML in a process pool, so total wall time tracks the slowest target.
+Styles live in cv_style.css, with cv_condensed.css and cv_screen.css layered
+on top for the one-page PDF and the standalone HTML respectively.
 
 Usage:
     conda env create -f environment.yml
     conda activate cv_pdf
     python generate_cv_pdf.py
+    python generate_cv_pdf.py --targets letter condensed
+    python generate_cv_pdf.py --optimize --max-size 300
+    python generate_cv_pdf.py --optimize --warn-size 300
+    python generate_cv_pdf.py --profile --profile-layout cprofile -j 1
+    python generate_cv_pdf.py --watch --targets letter html
 
 Output:
-    ../static/files/CXHernandez_CV.pdf
+    ../static/files/CXHernandez_CV.pdf          (letter)
+    ../static/files/CXHernandez_CV_A4.pdf       (a4)
+    ../static/files/CXHernandez_CV.html         (html)
+    ../static/files/CXHernandez_CV_onepage.pdf  (condensed, optional)
 """
 
+import argparse
 import logging
+import multiprocessing
+import os
+import resource
 import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from functools import partial
 from pathlib import Path
 
 import markdown
@@ -27,177 +48,554 @@ logger = logging.getLogger(__name__)
 
 SCRIPT_DIR = Path(__file__).parent.resolve()
 CV_MD_PATH = SCRIPT_DIR / ".." / "_includes" / "cv.md"
-OUTPUT_PATH = SCRIPT_DIR / ".." / "static" / "files" / "CXHernandez_CV.pdf"
+OUTPUT_DIR = SCRIPT_DIR / ".." / "static" / "files"
+OUTPUT_PATH = OUTPUT_DIR / "CXHernandez_CV.pdf"
 
-CSS_STYLES = """
-@page {
-    size: letter;
-    margin: 0.5in 0.6in;
-}
+CV_TITLE = "Carlos Xavier Hernández - CV"
 
-* {
-    margin: 0;
-    padding: 0;
-    box-sizing: border-box;
-}
+PAGE_CSS = """
+@page {{
+    size: {size};
+    margin: {margin};
+}}
+"""
 
-body {
-    font-family: -apple-system, BlinkMacSystemFont, "Helvetica Neue", Helvetica, Arial, sans-serif;
-    font-size: 9pt;
-    line-height: 1.45;
-    color: #333;
+CSS_PATH = SCRIPT_DIR / "cv_style.css"
+CONDENSED_CSS_PATH = SCRIPT_DIR / "cv_condensed.css"
+SCREEN_CSS_PATH = SCRIPT_DIR / "cv_screen.css"
+
+# Render targets keyed by name; "size" and "margin" only apply to PDFs.
+# Stylesheets are concatenated in order and re-read on every render.
+TARGETS = {
+    "letter": {
+        "format": "pdf",
+        "size": "letter",
+        "margin": "0.5in 0.6in",
+        "stylesheets": [CSS_PATH],
+        "output": OUTPUT_PATH,
+    },
+    "a4": {
+        "format": "pdf",
+        "size": "A4",
+        "margin": "0.5in 0.6in",
+        "stylesheets": [CSS_PATH],
+        "output": OUTPUT_DIR / "CXHernandez_CV_A4.pdf",
+    },
+    "html": {
+        "format": "html",
+        "stylesheets": [CSS_PATH, SCREEN_CSS_PATH],
+        "output": OUTPUT_DIR / "CXHernandez_CV.html",
+    },
+    "condensed": {
+        "format": "pdf",
+        "size": "letter",
+        "margin": "0.4in 0.5in",
+        "stylesheets": [CSS_PATH, CONDENSED_CSS_PATH],
+        "output": OUTPUT_DIR / "CXHernandez_CV_onepage.pdf",
+    },
 }
-
-/* Name */
-h1 {
-    font-size: 18pt;
-    font-weight: 600;
-    margin-bottom: 3pt;
-    color: #000;
+DEFAULT_TARGETS = ["letter", "a4", "html"]
+
+# Seconds between input checks in --watch mode
+WATCH_POLL_INTERVAL = 0.1
+
+# Extra write_pdf options for --optimize. They apply to embedded images,
+# which includes color emoji: WeasyPrint draws bitmap glyphs as images, so
+# "dpi" downscales them to the size they are printed at. Fonts are subset
+# by default, but a font WeasyPrint fails to subset (such as the macOS system
+# fonts cv_style.css used to name) is embedded whole with only a logged
+# warning, so cv_style.css names fonts that subset cleanly.
+OPTIMIZED_PDF_OPTIONS = {
+    "optimize_images": True,
+    "jpeg_quality": 85,
+    "dpi": 150,
 }
 
-/* Section headers */
-h2 {
-    font-size: 10pt;
-    font-weight: 600;
-    color: #000;
-    text-transform: uppercase;
-    letter-spacing: 0.06em;
-    border-bottom: 1.5pt solid #000;
-    padding-bottom: 3pt;
-    margin-top: 12pt;
-    margin-bottom: 6pt;
-    page-break-after: avoid;
-}
+HTML_TEMPLATE = """<!DOCTYPE html>
+<html>
+<head>
+    <meta charset="utf-8">
+{head}
+</head>
+<body>
+{body}
+</body>
+</html>
+"""
 
-/* Company/school names */
-h3 {
-    font-size: 9.5pt;
-    font-weight: 600;
-    color: #000;
-    margin-top: 8pt;
-    margin-bottom: 1pt;
-    page-break-after: avoid;
-}
 
-/* Subsection headers */
-h4 {
-    font-size: 8.5pt;
-    font-weight: 600;
-    color: #333;
-    margin-top: 6pt;
-    margin-bottom: 1pt;
-    page-break-after: avoid;
-}
+def read_cv(path):
+    """Read the CV markdown, raising if it is missing or empty."""
+    if not path.exists():
+        raise FileNotFoundError(f"CV markdown file not found: {path}")
 
-p {
-    font-size: 8.5pt;
-    margin-bottom: 3pt;
-    color: #333;
-}
+    logger.info(f"Reading CV from {path}")
+    md_content = path.read_text(encoding="utf-8")
 
-/* Role/degree styling */
-p strong {
-    font-weight: 600;
-}
+    if not md_content.strip():
+        raise ValueError("CV markdown file is empty")
+    return md_content
 
-p em {
-    font-style: italic;
-    color: #555;
-}
 
-ul {
-    margin: 3pt 0;
-    padding-left: 14pt;
-}
+def convert_markdown(md_content):
+    """Convert CV markdown to an HTML fragment."""
+    logger.info("Converting markdown to HTML")
+    return markdown.markdown(
+        md_content,
+        extensions=["extra", "smarty"],
+    )
 
-li {
-    font-size: 8.5pt;
-    margin-bottom: 2pt;
-    color: #333;
-}
 
-a {
-    color: #2a7ae2;
-    text-decoration: none;
-}
+def get_stylesheet(target):
+    """Return the full CSS for a target."""
+    spec = TARGETS[target]
+    css = "\n".join(path.read_text(encoding="utf-8") for path in spec["stylesheets"])
+    if spec["format"] == "pdf":
+        css = PAGE_CSS.format(size=spec["size"], margin=spec["margin"]) + css
+    return css
 
-code {
-    background-color: #f0f0f0;
-    padding: 0 3pt;
-    border-radius: 2pt;
-    font-size: 7.5pt;
-    color: #555;
-    font-family: "SF Mono", Menlo, Monaco, monospace;
-}
 
-hr {
-    border: none;
-    border-top: 0.5pt solid #ccc;
-    margin: 10pt 0;
-}
+def count_boxes(document):
+    """Count the laid-out boxes across all pages of a rendered document.
 
-/* Avoid page breaks inside list items and paragraphs */
-li, p {
-    page-break-inside: avoid;
-}
+    Relies on WeasyPrint's private Page._page_box, so it may need updating
+    when WeasyPrint is upgraded.
+    """
+    return sum(
+        sum(1 for _ in page._page_box.descendants()) for page in document.pages
+    )
 
-/* Keep headers with following content */
-h2, h3, h4 {
-    page-break-after: avoid;
-}
-"""
 
+def peak_rss_mb():
+    """Peak resident set size of the current process in MB.
+
+    This is a lifetime high-water mark, so it is only a per-target figure
+    when the target is rendered in a fresh process.
+    """
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is reported in bytes on macOS and kilobytes on Linux
+    return peak / 1024 / 1024 if sys.platform == "darwin" else peak / 1024
+
+
+def run_profiled(func, profiler, output_path):
+    """Call func under cProfile or pyinstrument and dump the results.
+
+    Args:
+        func: Zero-argument callable to profile
+        profiler: "cprofile" or "sampling"
+        output_path: Dump path, without extension
+
+    Returns:
+        Whatever func returns
+    """
+    if profiler == "cprofile":
+        import cProfile
+
+        prof = cProfile.Profile()
+        result = prof.runcall(func)
+        prof.dump_stats(output_path.with_suffix(".prof"))
+        return result
 
-def main():
-    """Generate CV PDF from markdown source."""
     try:
-        # Validate input file exists
-        if not CV_MD_PATH.exists():
-            logger.error(f"CV markdown file not found: {CV_MD_PATH}")
-            sys.exit(1)
+        from pyinstrument import Profiler
+    except ImportError as e:
+        raise RuntimeError("Sampling profiler requires pyinstrument") from e
 
-        logger.info(f"Reading CV from {CV_MD_PATH}")
-        md_content = CV_MD_PATH.read_text(encoding="utf-8")
+    prof = Profiler()
+    prof.start()
+    try:
+        result = func()
+    finally:
+        prof.stop()
+    output_path.with_suffix(".html").write_text(prof.output_html(), encoding="utf-8")
+    return result
+
+
+def render_target(target, html_content, optimize=False, profile=False,
+                  layout_profiler=None, profile_dir=None):
+    """Render one target from the shared HTML fragment.
+
+    Runs in a worker process, so it only takes picklable arguments.
+
+    Args:
+        target: Key into TARGETS
+        html_content: HTML fragment produced by convert_markdown
+        optimize: Apply OPTIMIZED_PDF_OPTIONS to PDF targets
+        profile: Also record page count, box count and peak RSS
+        layout_profiler: "cprofile" or "sampling" to profile the layout phase
+        profile_dir: Directory for layout profiler dumps
+
+    Returns:
+        Tuple of (target name, output path, stats dict with per-phase seconds)
+    """
+    start = time.perf_counter()
+    spec = TARGETS[target]
+    output_path = spec["output"]
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    stats = {}
+
+    if spec["format"] == "html":
+        head = (
+            '    <meta name="viewport" content="width=device-width, initial-scale=1.0">\n'
+            f"    <title>{CV_TITLE}</title>\n"
+            f"    <style>\n{get_stylesheet(target)}</style>"
+        )
+        output_path.write_text(
+            HTML_TEMPLATE.format(head=head, body=html_content), encoding="utf-8"
+        )
+        stats["write"] = time.perf_counter() - start
+    else:
+        full_html = HTML_TEMPLATE.format(head="", body=html_content)
+        html_doc = HTML(string=full_html)
+        css = CSS(string=get_stylesheet(target))
+        stats["parse"] = time.perf_counter() - start
 
-        if not md_content.strip():
-            logger.error("CV markdown file is empty")
-            sys.exit(1)
+        phase_start = time.perf_counter()
+        pdf_options = dict(OPTIMIZED_PDF_OPTIONS) if optimize else {}
+        layout = partial(
+            html_doc.render, stylesheets=[css], **pdf_options
+        )
+        if layout_profiler:
+            dump_path = Path(profile_dir) / f"cv_layout_{target}"
+            document = run_profiled(layout, layout_profiler, dump_path)
+        else:
+            document = layout()
+        stats["layout"] = time.perf_counter() - phase_start
+
+        if target == "condensed" and len(document.pages) > 1:
+            logger.warning(
+                f"Condensed CV spans {len(document.pages)} pages, expected 1"
+            )
+
+        phase_start = time.perf_counter()
+        document.write_pdf(output_path, **pdf_options)
+        stats["write"] = time.perf_counter() - phase_start
+
+        if profile:
+            stats["pages"] = len(document.pages)
+            stats["boxes"] = count_boxes(document)
+
+    if profile:
+        stats["peak_rss_mb"] = peak_rss_mb()
+    stats["total"] = time.perf_counter() - start
+    return target, output_path, stats
+
+
+def log_rendered(target, output_path, stats):
+    logger.info(f"Rendered {target} -> {output_path} ({stats['total']:.2f}s)")
+
+
+def render_targets(html_content, targets, jobs=None, executor=None,
+                   **render_options):
+    """Render all targets, in parallel when more than one job is allowed.
+
+    Extra keyword arguments are passed through to render_target.
+
+    Args:
+        executor: Existing process pool to reuse; one is created (or the
+            targets are rendered inline for a single job) when omitted
+
+    Returns:
+        Dict mapping target name to its stats dict
+    """
+    worker = partial(render_target, html_content=html_content, **render_options)
+    all_stats = {}
+
+    if executor is None:
+        jobs = jobs or min(len(targets), os.cpu_count() or 1)
+        if render_options.get("profile"):
+            # One fresh process per target so peak RSS isn't carried over
+            with multiprocessing.Pool(jobs, maxtasksperchild=1) as pool:
+                for target, output_path, stats in pool.imap_unordered(worker, targets):
+                    log_rendered(target, output_path, stats)
+                    all_stats[target] = stats
+            return all_stats
+
+        if jobs == 1:
+            for target, output_path, stats in map(worker, targets):
+                log_rendered(target, output_path, stats)
+                all_stats[target] = stats
+            return all_stats
+
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            return render_targets(
+                html_content, targets, executor=executor, **render_options
+            )
+
+    futures = [executor.submit(worker, target) for target in targets]
+    for future in as_completed(futures):
+        target, output_path, stats = future.result()
+        log_rendered(target, output_path, stats)
+        all_stats[target] = stats
+    return all_stats
+
+
+def get_dependents(targets):
+    """Map each watched input path to the targets that depend on it."""
+    dependents = {CV_MD_PATH: set(targets)}
+    for target in targets:
+        for path in TARGETS[target]["stylesheets"]:
+            dependents.setdefault(path, set()).add(target)
+    return dependents
+
+
+def snapshot_mtimes(paths):
+    """Return modification times for paths, None for missing files."""
+    mtimes = {}
+    for path in paths:
+        # Editors that save by rename can remove the file between checks
+        try:
+            mtimes[path] = path.stat().st_mtime_ns
+        except FileNotFoundError:
+            mtimes[path] = None
+    return mtimes
+
+
+def watch(targets, jobs=None, debounce=0.3, **render_options):
+    """Keep a warm renderer running and re-render targets as inputs change.
+
+    The markdown is only re-parsed when cv.md changes, and a stylesheet change
+    only re-renders the targets that use it. Changes are batched until the
+    inputs have been quiet for the debounce window. Worker processes persist
+    between renders, so imports and font configuration are paid once.
+
+    Args:
+        targets: Target names to keep up to date
+        jobs: Worker processes; 1 renders in this process
+        debounce: Seconds the inputs must be unchanged before re-rendering
+    """
+    dependents = get_dependents(targets)
+    jobs = jobs or min(len(targets), os.cpu_count() or 1)
+    executor = ProcessPoolExecutor(max_workers=jobs) if jobs > 1 else None
+
+    html_content = None
+    changed = set(dependents)
+    mtimes = snapshot_mtimes(dependents)
+    logger.info(f"Watching {', '.join(str(path) for path in dependents)}")
 
-        # Convert markdown to HTML
-        logger.info("Converting markdown to HTML")
-        html_content = markdown.markdown(
-            md_content,
-            extensions=["extra", "smarty"],
+    try:
+        while True:
+            if changed:
+                pending = set().union(*(dependents[path] for path in changed))
+                start = time.perf_counter()
+                try:
+                    if CV_MD_PATH in changed or html_content is None:
+                        html_content = convert_markdown(read_cv(CV_MD_PATH))
+                    render_targets(
+                        html_content,
+                        [t for t in targets if t in pending],
+                        jobs,
+                        executor=executor,
+                        **render_options,
+                    )
+                    logger.info(f"Rebuilt in {time.perf_counter() - start:.2f}s")
+                except BrokenProcessPool as e:
+                    # A worker died (e.g. a crash in pango); replace the pool
+                    # so later rebuilds don't keep failing
+                    logger.error(f"Render worker crashed, restarting pool: {e}")
+                    executor.shutdown(cancel_futures=True)
+                    executor = ProcessPoolExecutor(max_workers=jobs)
+                except Exception as e:
+                    logger.error(f"Failed to generate CV: {e}")
+                    if CV_MD_PATH in changed:
+                        html_content = None
+                changed = set()
+
+            time.sleep(WATCH_POLL_INTERVAL)
+            current = snapshot_mtimes(dependents)
+            if current == mtimes:
+                continue
+
+            # Wait for editors that write in several steps to settle
+            while True:
+                time.sleep(debounce)
+                settled = snapshot_mtimes(dependents)
+                if settled == current:
+                    break
+                current = settled
+
+            changed = {path for path in current if current[path] != mtimes[path]}
+            mtimes = current
+            logger.info(f"Changed: {', '.join(path.name for path in changed)}")
+    except KeyboardInterrupt:
+        logger.info("Stopping watch")
+    finally:
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+
+
+def log_profile(markdown_seconds, all_stats):
+    """Log a per-phase timing table for --profile."""
+    logger.info(f"Profile: markdown conversion {markdown_seconds * 1000:.1f} ms")
+    header = (
+        f"{'target':<10} {'parse':>9} {'layout':>9} {'write':>9} {'total':>9}"
+        f" {'pages':>6} {'boxes':>7} {'peak MB':>8}"
+    )
+    logger.info(f"Profile: {header}")
+    for target, stats in all_stats.items():
+        phases = " ".join(
+            f"{stats[phase] * 1000:>6.1f} ms" if phase in stats else f"{'-':>9}"
+            for phase in ("parse", "layout", "write", "total")
+        )
+        logger.info(
+            f"Profile: {target:<10} {phases}"
+            f" {stats.get('pages', '-'):>6} {stats.get('boxes', '-'):>7}"
+            f" {stats['peak_rss_mb']:>8.1f}"
         )
 
-        # Wrap in full HTML document
-        full_html = f"""
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <meta charset="utf-8">
-        </head>
-        <body>
-            {html_content}
-        </body>
-        </html>
-        """
-
-        # Ensure output directory exists
-        OUTPUT_PATH.parent.mkdir(parents=True, exist_ok=True)
-
-        # Generate PDF
-        logger.info(f"Generating PDF at {OUTPUT_PATH}")
-        html_doc = HTML(string=full_html)
-        css = CSS(string=CSS_STYLES)
-        html_doc.write_pdf(OUTPUT_PATH, stylesheets=[css])
 
-        logger.info(f"Successfully generated PDF: {OUTPUT_PATH}")
-        logger.info(f"PDF size: {OUTPUT_PATH.stat().st_size / 1024:.1f} KB")
+def parse_cmdln():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument(
+        "-t",
+        "--targets",
+        dest="targets",
+        nargs="+",
+        choices=list(TARGETS),
+        default=DEFAULT_TARGETS,
+        help=f"Targets to render (default: {' '.join(DEFAULT_TARGETS)})",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        dest="jobs",
+        type=int,
+        default=None,
+        help="Worker processes (default: one per target, up to CPU count)",
+    )
+    parser.add_argument(
+        "--optimize",
+        dest="optimize",
+        action="store_true",
+        help="Losslessly optimize, re-encode and downscale embedded images, "
+        "including color emoji",
+    )
+    parser.add_argument(
+        "--max-size",
+        dest="max_size",
+        type=float,
+        default=None,
+        metavar="KB",
+        help="Fail if any output is larger than this many kilobytes",
+    )
+    parser.add_argument(
+        "--warn-size",
+        dest="warn_size",
+        type=float,
+        default=None,
+        metavar="KB",
+        help="Warn, without failing, if any output is larger than this many "
+        "kilobytes",
+    )
+    parser.add_argument(
+        "--profile",
+        dest="profile",
+        action="store_true",
+        help="Report per-phase timings, page and box counts and peak RSS; "
+        "each target renders in a fresh process "
+        "(use -j 1 for uncontended timings)",
+    )
+    parser.add_argument(
+        "--profile-layout",
+        dest="layout_profiler",
+        choices=["cprofile", "sampling"],
+        default=None,
+        help="Dump a cProfile or pyinstrument profile of the layout phase "
+        "(implies --profile)",
+    )
+    parser.add_argument(
+        "--profile-dir",
+        dest="profile_dir",
+        default=".",
+        help="Directory for layout profile dumps (default: current directory)",
+    )
+    parser.add_argument(
+        "-w",
+        "--watch",
+        dest="watch",
+        action="store_true",
+        help="Keep running and re-render targets when cv.md or their "
+        "stylesheets change",
+    )
+    parser.add_argument(
+        "--debounce",
+        dest="debounce",
+        type=float,
+        default=0.3,
+        help="Seconds inputs must be quiet before re-rendering in --watch "
+        "mode (default: 0.3)",
+    )
+    args = parser.parse_args()
+    if args.watch and (args.profile or args.layout_profiler):
+        # Profiling renders each target in a fresh process, which would
+        # defeat the warm renderer that --watch exists for
+        parser.error("--profile and --profile-layout cannot be used with --watch")
+    return args
+
+
+def main():
+    """Generate CV targets from markdown source."""
+    options = parse_cmdln()
+    # Preserve order while dropping duplicates
+    targets = list(dict.fromkeys(options.targets))
+    profile = options.profile or options.layout_profiler is not None
+    if options.layout_profiler:
+        Path(options.profile_dir).mkdir(parents=True, exist_ok=True)
+
+    render_options = {
+        "optimize": options.optimize,
+        "profile": profile,
+        "layout_profiler": options.layout_profiler,
+        "profile_dir": options.profile_dir,
+    }
+
+    if options.watch:
+        watch(targets, options.jobs, options.debounce, **render_options)
+        return
+
+    try:
+        start = time.perf_counter()
+        md_content = read_cv(CV_MD_PATH)
+        markdown_start = time.perf_counter()
+        html_content = convert_markdown(md_content)
+        markdown_seconds = time.perf_counter() - markdown_start
+
+        logger.info(f"Rendering targets: {', '.join(targets)}")
+        all_stats = render_targets(
+            html_content,
+            targets,
+            options.jobs,
+            **render_options,
+        )
+
+        over_budget = []
+        for target in targets:
+            output_path = TARGETS[target]["output"]
+            size_kb = output_path.stat().st_size / 1024
+            logger.info(f"{target}: {size_kb:.1f} KB in {all_stats[target]['total']:.2f}s")
+            if options.max_size is not None and size_kb > options.max_size:
+                over_budget.append(f"{target} ({size_kb:.1f} KB)")
+            if options.warn_size is not None and size_kb > options.warn_size:
+                logger.warning(
+                    f"{target} is {size_kb:.1f} KB, over the "
+                    f"{options.warn_size:g} KB size budget"
+                )
+        logger.info(f"Generated {len(targets)} targets in {time.perf_counter() - start:.2f}s")
+
+        if profile:
+            log_profile(markdown_seconds, {t: all_stats[t] for t in targets})
+
+        if over_budget:
+            logger.error(
+                f"Size budget of {options.max_size:g} KB exceeded by: "
+                f"{', '.join(over_budget)}"
+            )
+            sys.exit(1)
 
     except Exception as e:
-        logger.error(f"Failed to generate CV PDF: {e}")
+        logger.error(f"Failed to generate CV: {e}")
         sys.exit(1)
 
 
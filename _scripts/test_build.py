@@ -0,0 +1,158 @@
+import functools
+import sys
+
+import pytest
+
+import build
+
+
+def step(code, inputs=(), outputs=(), timeout=30, volatile=False, allow_stale=False,
+         **options):
+    """A stub build step that runs a Python snippet from the build root."""
+    return {
+        **options,
+        "cmd": [sys.executable, "-c", code],
+        "inputs": list(inputs),
+        "outputs": list(outputs),
+        "timeout": timeout,
+        "volatile": volatile,
+        "allow_stale": allow_stale,
+    }
+
+
+@pytest.fixture
+def steps(tmp_path, monkeypatch):
+    """Run builds against stub steps in a scratch root directory."""
+    stubs = {}
+    monkeypatch.setattr(build, "STEPS", stubs)
+    monkeypatch.setattr(build, "ROOT_DIR", tmp_path)
+    monkeypatch.delenv("GITHUB_ACTIONS", raising=False)
+    return stubs
+
+
+def run(steps_to_run, tmp_path):
+    return build.build(steps_to_run, cache_path=tmp_path / ".build_cache.json")
+
+
+def test_step_waits_for_producer_of_its_input(steps, tmp_path):
+    steps["first"] = step(
+        "import time; time.sleep(0.3); open('a.txt', 'w').write('a')",
+        outputs=["a.txt"],
+    )
+    steps["second"] = step(
+        "open('b.txt', 'w').write(open('a.txt').read() + 'b')",
+        inputs=["a.txt"],
+        outputs=["b.txt"],
+    )
+
+    assert build.get_dependencies(["second", "first"]) == {
+        "second": {"first"},
+        "first": set(),
+    }
+    results = run(["second", "first"], tmp_path)
+    assert {name: status for name, (status, _) in results.items()} == {
+        "first": "ok",
+        "second": "ok",
+    }
+    assert (tmp_path / "b.txt").read_text() == "ab"
+
+
+def test_in_place_step_does_not_depend_on_itself(steps):
+    steps["enrich"] = step("pass", inputs=["data.json"], outputs=["data.json"])
+    assert build.get_dependencies(["enrich"]) == {"enrich": set()}
+
+
+def test_dependents_of_failed_step_are_blocked(steps, tmp_path):
+    steps["first"] = step("raise SystemExit(3)", outputs=["a.txt"])
+    steps["second"] = step("pass", inputs=["a.txt"])
+
+    results = run(["first", "second"], tmp_path)
+    assert results["first"][0] == "failed"
+    assert results["second"][0] == "blocked"
+
+
+def test_unchanged_step_is_skipped_until_an_input_changes(steps, tmp_path):
+    (tmp_path / "in.txt").write_text("one")
+    steps["copy"] = step(
+        "open('out.txt', 'w').write(open('in.txt').read())",
+        inputs=["in.txt"],
+        outputs=["out.txt"],
+    )
+
+    assert run(["copy"], tmp_path)["copy"][0] == "ok"
+    assert run(["copy"], tmp_path)["copy"][0] == "skipped"
+
+    (tmp_path / "in.txt").write_text("two")
+    assert run(["copy"], tmp_path)["copy"][0] == "ok"
+    assert (tmp_path / "out.txt").read_text() == "two"
+
+
+def test_modified_output_or_volatile_step_is_not_skipped(steps, tmp_path):
+    steps["copy"] = step("open('out.txt', 'w').write('x')", outputs=["out.txt"])
+    steps["remote"] = step("open('r.txt', 'w').write('r')", outputs=["r.txt"],
+                           volatile=True)
+
+    run(["copy", "remote"], tmp_path)
+    (tmp_path / "out.txt").write_text("edited")
+    results = run(["copy", "remote"], tmp_path)
+    assert results["copy"][0] == "ok"
+    assert results["remote"][0] == "ok"
+
+
+def test_cycle_is_rejected(steps, tmp_path):
+    steps["a"] = step("pass", inputs=["b.txt"], outputs=["a.txt"])
+    steps["b"] = step("pass", inputs=["a.txt"], outputs=["b.txt"])
+
+    with pytest.raises(ValueError, match="cycle"):
+        build.check_acyclic(build.get_dependencies(["a", "b"]))
+    with pytest.raises(ValueError, match="cycle"):
+        run(["a", "b"], tmp_path)
+
+
+def test_timed_out_step_falls_back_to_stale_outputs(steps, tmp_path, capsys):
+    (tmp_path / "old.txt").write_text("old")
+    steps["slow"] = step(
+        "print('partial', flush=True); import time; time.sleep(10)",
+        outputs=["old.txt"],
+        timeout=0.5,
+        allow_stale=True,
+    )
+
+    assert run(["slow"], tmp_path)["slow"][0] == "stale"
+    assert (tmp_path / "old.txt").read_text() == "old"
+    assert "[slow] partial" in capsys.readouterr().out
+
+
+def test_timed_out_step_fails_without_stale_fallback(steps, tmp_path):
+    steps["strict"] = step("import time; time.sleep(10)", timeout=0.5)
+    steps["lenient"] = step(
+        "import time; time.sleep(10)",
+        outputs=["missing.txt"],
+        timeout=0.5,
+        allow_stale=True,
+    )
+
+    results = run(["strict", "lenient"], tmp_path)
+    assert results["strict"][0] == "failed"
+    # allow_stale needs existing outputs to fall back to
+    assert results["lenient"][0] == "failed"
+
+
+def test_failed_best_effort_step_is_degraded_without_failing_build(
+    steps, tmp_path, monkeypatch
+):
+    steps["optional"] = step(
+        "raise SystemExit(1)",
+        outputs=["missing.txt"],
+        volatile=True,
+        allow_stale=True,
+        best_effort=True,
+    )
+
+    assert run(["optional"], tmp_path)["optional"][0] == "degraded"
+
+    monkeypatch.setattr(sys, "argv", ["build.py"])
+    monkeypatch.setattr(
+        build, "build", functools.partial(build.build, cache_path=tmp_path / ".cache")
+    )
+    build.main()  # would raise SystemExit(1) on a failed step
@@ -2,12 +2,17 @@
  * Cloudflare Worker for Square Photography Store
  *
  * This worker provides:
- * - /catalog - Fetch items from Square catalog
+ * - /catalog - Serve the build-time catalog snapshot, falling back to Square
  * - /checkout - Create a Square hosted checkout link
  *
  * Required secrets (set via `wrangler secret put`):
  * - SQUARE_ACCESS_TOKEN: Your Square API access token
  * - SQUARE_LOCATION_ID: Your Square location ID
+ *
+ * Optional vars:
+ * - CATALOG_SNAPSHOT_URL: Snapshot written by scripts/catalog_snapshot.py
+ * - CATALOG_SNAPSHOT_MAX_AGE: Seconds since the snapshot was last confirmed
+ *   against Square before falling back to live fetches (default: 12 hours)
  */
 
 const CORS_HEADERS = {
@@ -23,6 +28,8 @@ const DEV_CORS_HEADERS = {
   'Access-Control-Allow-Headers': 'Content-Type',
 };
 
+const DEFAULT_CATALOG_SNAPSHOT_MAX_AGE = 12 * 60 * 60;
+
 // Square API base URLs
 const SQUARE_API = {
   sandbox: 'https://connect.squareupsandbox.com/v2',
@@ -43,7 +50,7 @@ export default {
     const url = new URL(request.url);
 
     if (url.pathname === '/catalog' && request.method === 'GET') {
-      return handleGetCatalog(env, corsHeaders);
+      return handleGetCatalog(request, env, corsHeaders);
     }
 
     if (url.pathname === '/checkout' && request.method === 'POST') {
@@ -67,7 +74,59 @@ export default {
   },
 };
 
-async function handleGetCatalog(env, corsHeaders) {
+async function handleGetCatalog(request, env, corsHeaders) {
+  const snapshot = await fetchCatalogSnapshot(env);
+  if (!snapshot) {
+    return handleGetLiveCatalog(env, corsHeaders);
+  }
+
+  const etag = `"${snapshot.version}"`;
+  const headers = {
+    ...corsHeaders,
+    'Content-Type': 'application/json',
+    'Cache-Control': 'public, max-age=300',
+    'ETag': etag,
+  };
+  if (request.headers.get('If-None-Match') === etag) {
+    return new Response(null, { status: 304, headers });
+  }
+  return new Response(snapshot.body, { headers });
+}
+
+// Load the precomputed catalog snapshot. Returns null when it is not
+// configured, unreachable, malformed, built for another Square environment or
+// not confirmed against Square within the max age, in which case the caller
+// falls back to a live catalog fetch.
+async function fetchCatalogSnapshot(env) {
+  if (!env.CATALOG_SNAPSHOT_URL) return null;
+  try {
+    const response = await fetch(env.CATALOG_SNAPSHOT_URL, {
+      cf: { cacheTtl: 300, cacheEverything: true },
+    });
+    if (!response.ok) return null;
+
+    const body = await response.text();
+    const snapshot = JSON.parse(body);
+    const environment = env.SQUARE_ENVIRONMENT === 'production' ? 'production' : 'sandbox';
+    if (!snapshot.success || !snapshot.version || !Array.isArray(snapshot.items)
+      || snapshot.environment !== environment) {
+      return null;
+    }
+
+    const maxAge = Number(env.CATALOG_SNAPSHOT_MAX_AGE) || DEFAULT_CATALOG_SNAPSHOT_MAX_AGE;
+    const checkedAt = Date.parse(snapshot.checked_at || snapshot.generated_at);
+    if (!Number.isFinite(checkedAt) || Date.now() - checkedAt > maxAge * 1000) {
+      console.warn('Catalog snapshot is stale, using live catalog');
+      return null;
+    }
+    return { version: snapshot.version, body };
+  } catch (error) {
+    console.error('Catalog snapshot error:', error);
+    return null;
+  }
+}
+
+async function handleGetLiveCatalog(env, corsHeaders) {
   try {
     const apiBase = env.SQUARE_ENVIRONMENT === 'production'
       ? SQUARE_API.production
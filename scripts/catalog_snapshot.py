@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Write a compact, versioned snapshot of the Square catalog for the Cloudflare
+worker's /catalog endpoint to serve instead of calling Square per request.
+
+Usage:
+  python3 scripts/catalog_snapshot.py static/files/store/catalog.json
+
+Environment variables:
+  SQUARE_ACCESS_TOKEN      - Required; without it the snapshot is left as is
+  SQUARE_ENVIRONMENT       - sandbox|production (default: sandbox)
+  SQUARE_API_BASE          - Override the API base URL (e.g. a local stand-in)
+
+The snapshot has the same shape as the worker's live /catalog response plus
+a content-derived "version". Its items, version and "generated_at" only change
+when the catalog does; every successful run refreshes "checked_at", which the
+worker uses to stop serving a snapshot that has not been confirmed recently.
+"""
+import sys
+import json
+import os
+import hashlib
+import datetime
+import urllib.error
+import urllib.request
+import urllib.parse
+
+from enrich_inventory import api_base, square_headers
+
+
+def fetch_catalog_objects(token):
+    """List all ITEM and IMAGE catalog objects, following pagination.
+
+    Raises on any HTTP or network error so a partial catalog is never written.
+    """
+    base = api_base()
+    headers = square_headers(token)
+
+    objects = []
+    cursor = None
+    while True:
+        qs = {'types': 'ITEM,IMAGE'}
+        if cursor:
+            qs['cursor'] = cursor
+        url = f"{base}/catalog/list?" + urllib.parse.urlencode(qs)
+        req = urllib.request.Request(url, headers=headers, method='GET')
+        with urllib.request.urlopen(req, timeout=30) as resp:
+            data = json.load(resp)
+
+        objects.extend(data.get('objects', []))
+        cursor = data.get('cursor')
+        if not cursor:
+            break
+    return objects
+
+
+def build_items(objects):
+    """Convert catalog objects to the item list the worker returns."""
+    image_map = {}
+    for obj in objects:
+        if obj.get('type') == 'IMAGE' and obj.get('image_data'):
+            image_map[obj['id']] = obj['image_data'].get('url')
+
+    items = []
+    for obj in objects:
+        item_data = obj.get('item_data')
+        if obj.get('type') != 'ITEM' or not item_data:
+            continue
+        variations = []
+        for v in item_data.get('variations') or []:
+            vd = v.get('item_variation_data') or {}
+            money = vd.get('price_money') or {}
+            variations.append({
+                'id': v.get('id'),
+                'name': vd.get('name') or '',
+                'price': money.get('amount') or 0,
+                'currency': money.get('currency') or 'USD',
+            })
+        items.append({
+            'id': obj['id'],
+            'name': item_data.get('name'),
+            'description': item_data.get('description') or '',
+            'variations': variations,
+            'images': [image_map[i] for i in item_data.get('image_ids') or [] if image_map.get(i)],
+        })
+    return items
+
+
+def snapshot_version(items, environment):
+    canonical = json.dumps([environment, items], sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()[:16]
+
+
+def read_snapshot(path):
+    try:
+        with open(path, 'r') as f:
+            snapshot = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return snapshot if isinstance(snapshot, dict) else None
+
+
+def utc_now():
+    return datetime.datetime.now(datetime.timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+
+
+def write_snapshot(output_path):
+    token = os.environ.get('SQUARE_ACCESS_TOKEN')
+    if not token:
+        print('No SQUARE_ACCESS_TOKEN set, leaving catalog snapshot unchanged')
+        return
+
+    # Matches the worker, which treats anything but production as sandbox
+    environment = 'production' if os.environ.get('SQUARE_ENVIRONMENT') == 'production' else 'sandbox'
+    print('Fetching catalog from Square API...')
+    items = build_items(fetch_catalog_objects(token))
+    version = snapshot_version(items, environment)
+
+    now = utc_now()
+    snapshot = read_snapshot(output_path)
+    if snapshot and snapshot.get('version') == version:
+        snapshot['checked_at'] = now
+        print(f'Catalog unchanged (version {version}), refreshing checked_at')
+    else:
+        snapshot = {
+            'success': True,
+            'version': version,
+            'environment': environment,
+            'generated_at': now,
+            'checked_at': now,
+            'items': items,
+        }
+        print(f'Wrote {len(items)} items (version {version}) to {output_path}')
+
+    os.makedirs(os.path.dirname(output_path) or '.', exist_ok=True)
+    with open(output_path, 'w') as f:
+        json.dump(snapshot, f, separators=(',', ':'))
+
+
+if __name__ == '__main__':
+    if len(sys.argv) < 2:
+        print('Usage: catalog_snapshot.py path/to/catalog.json', file=sys.stderr)
+        sys.exit(2)
+    try:
+        write_snapshot(sys.argv[1])
+    except urllib.error.HTTPError as e:
+        print('HTTP error while listing catalog:', e.read().decode(), file=sys.stderr)
+        sys.exit(1)
+    except Exception as e:
+        print('Error while listing catalog:', e, file=sys.stderr)
+        sys.exit(1)
@@ -8,6 +8,7 @@ Usage:
 Optional environment variables:
   SQUARE_ACCESS_TOKEN      - If set, will try to match against API payment links
   SQUARE_ENVIRONMENT       - sandbox|production (default: sandbox)
+  SQUARE_API_BASE          - Override the API base URL (e.g. a local stand-in)
 
 If API matching fails or no token is provided, the script will scrape the
 checkout page directly to extract product details.
@@ -22,20 +23,27 @@ import urllib.parse
 
 
 def api_base():
+    override = os.environ.get('SQUARE_API_BASE')
+    if override:
+        return override.rstrip('/')
     env = os.environ.get('SQUARE_ENVIRONMENT', 'sandbox')
     if env == 'production':
         return 'https://connect.squareup.com/v2'
     return 'https://connect.squareupsandbox.com/v2'
 
 
-def fetch_payment_links(token, limit=100):
-    base = api_base()
-    headers = {
+def square_headers(token):
+    return {
         'Square-Version': '2024-01-18',
         'Authorization': f'Bearer {token}',
         'Content-Type': 'application/json',
     }
 
+
+def fetch_payment_links(token, limit=100):
+    base = api_base()
+    headers = square_headers(token)
+
     results = []
     cursor = None
     while True:
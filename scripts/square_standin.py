@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Minimal local stand-in for the Square catalog API, for exercising
+catalog_snapshot.py without network access or a real token.
+
+Usage:
+  python3 scripts/square_standin.py [port]
+  SQUARE_API_BASE=http://127.0.0.1:8765/v2 SQUARE_ACCESS_TOKEN=test \
+      python3 scripts/catalog_snapshot.py /tmp/catalog.json
+
+Serves GET /v2/catalog/list as two pages linked by a cursor, like Square's
+paginated responses. Requests without a bearer token get a 401.
+"""
+import sys
+import json
+import threading
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+# Pages keyed by the cursor that requests them (None for the first page)
+CATALOG_PAGES = {
+    None: {
+        'objects': [
+            {
+                'type': 'IMAGE',
+                'id': 'IMG1',
+                'image_data': {'url': 'https://example.com/images/sunrise.jpg'},
+            },
+            {
+                'type': 'ITEM',
+                'id': 'ITEM1',
+                'item_data': {
+                    'name': 'Sunrise Print',
+                    'description': 'Archival pigment print',
+                    'image_ids': ['IMG1', 'MISSING'],
+                    'variations': [
+                        {
+                            'id': 'VAR1',
+                            'item_variation_data': {
+                                'name': '8x10',
+                                'price_money': {'amount': 4500, 'currency': 'USD'},
+                            },
+                        },
+                    ],
+                },
+            },
+        ],
+        'cursor': 'page2',
+    },
+    'page2': {
+        'objects': [
+            {
+                'type': 'ITEM',
+                'id': 'ITEM2',
+                'item_data': {'name': 'Portrait Session'},
+            },
+        ],
+    },
+}
+
+
+class CatalogHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        url = urllib.parse.urlparse(self.path)
+        if url.path != '/v2/catalog/list':
+            return self.send_json(404, {'errors': [{'detail': 'Not found'}]})
+        if not (self.headers.get('Authorization') or '').startswith('Bearer '):
+            return self.send_json(401, {'errors': [{'detail': 'Unauthorized'}]})
+
+        cursor = urllib.parse.parse_qs(url.query).get('cursor', [None])[0]
+        page = self.server.pages.get(cursor)
+        if page is None:
+            return self.send_json(400, {'errors': [{'detail': 'Invalid cursor'}]})
+        self.send_json(200, page)
+
+    def send_json(self, status, data):
+        body = json.dumps(data).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_server(pages=None, port=0):
+    """Start the stand-in in a background thread and return the server.
+
+    The API base URL is f'http://127.0.0.1:{server.server_port}/v2'. Replace
+    server.pages to simulate a catalog change.
+    """
+    server = ThreadingHTTPServer(('127.0.0.1', port), CatalogHandler)
+    server.pages = pages if pages is not None else CATALOG_PAGES
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+if __name__ == '__main__':
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else 8765
+    server = ThreadingHTTPServer(('127.0.0.1', port), CatalogHandler)
+    server.pages = CATALOG_PAGES
+    print(f'Serving stand-in Square API at http://127.0.0.1:{port}/v2')
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,75 @@
+import copy
+import json
+
+import pytest
+
+import catalog_snapshot
+from square_standin import CATALOG_PAGES, start_server
+
+# Fields the worker's handleGetLiveCatalog returns for each item and variation
+ITEM_KEYS = {'id', 'name', 'description', 'variations', 'images'}
+VARIATION_KEYS = {'id', 'name', 'price', 'currency'}
+
+
+@pytest.fixture
+def square(monkeypatch):
+    server = start_server(pages=copy.deepcopy(CATALOG_PAGES))
+    monkeypatch.setenv('SQUARE_API_BASE', f'http://127.0.0.1:{server.server_port}/v2')
+    monkeypatch.setenv('SQUARE_ACCESS_TOKEN', 'test-token')
+    monkeypatch.delenv('SQUARE_ENVIRONMENT', raising=False)
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def test_snapshot_follows_pagination_and_matches_worker_shape(square, tmp_path):
+    output = tmp_path / 'catalog.json'
+    catalog_snapshot.write_snapshot(str(output))
+
+    snapshot = json.loads(output.read_text())
+    assert snapshot['success'] is True
+    assert snapshot['environment'] == 'sandbox'
+    assert [item['id'] for item in snapshot['items']] == ['ITEM1', 'ITEM2']
+
+    for item in snapshot['items']:
+        assert set(item) == ITEM_KEYS
+        for variation in item['variations']:
+            assert set(variation) == VARIATION_KEYS
+
+    sunrise = snapshot['items'][0]
+    assert sunrise['images'] == ['https://example.com/images/sunrise.jpg']
+    assert sunrise['variations'] == [
+        {'id': 'VAR1', 'name': '8x10', 'price': 4500, 'currency': 'USD'},
+    ]
+    assert snapshot['items'][1]['description'] == ''
+
+
+def test_snapshot_only_regenerated_when_catalog_changes(square, tmp_path, monkeypatch):
+    output = tmp_path / 'catalog.json'
+    monkeypatch.setattr(catalog_snapshot, 'utc_now', lambda: '2026-01-01T00:00:00Z')
+    catalog_snapshot.write_snapshot(str(output))
+    first = json.loads(output.read_text())
+    assert first['checked_at'] == first['generated_at'] == '2026-01-01T00:00:00Z'
+
+    monkeypatch.setattr(catalog_snapshot, 'utc_now', lambda: '2026-01-01T06:00:00Z')
+    catalog_snapshot.write_snapshot(str(output))
+    second = json.loads(output.read_text())
+    assert second['checked_at'] == '2026-01-01T06:00:00Z'
+    assert {k: v for k, v in second.items() if k != 'checked_at'} == {
+        k: v for k, v in first.items() if k != 'checked_at'
+    }
+
+    square.pages['page2']['objects'][0]['item_data']['name'] = 'Event Session'
+    catalog_snapshot.write_snapshot(str(output))
+    third = json.loads(output.read_text())
+    assert third['version'] != first['version']
+    assert third['generated_at'] == '2026-01-01T06:00:00Z'
+    assert third['items'][1]['name'] == 'Event Session'
+
+
+def test_fetch_errors_propagate_without_writing(square, tmp_path, monkeypatch):
+    monkeypatch.setenv('SQUARE_API_BASE', f'http://127.0.0.1:{square.server_port}/v1')
+    output = tmp_path / 'catalog.json'
+    with pytest.raises(catalog_snapshot.urllib.error.HTTPError):
+        catalog_snapshot.write_snapshot(str(output))
+    assert not output.exists()